@@ -0,0 +1,58 @@
+# app/api/metrics_routes.py
+# -------------------------------------------------------------------------
+#  Scanalyzer ‑ Admin side – Metrics / profiling api
+# -------------------------------------------------------------------------
+from fastapi import APIRouter, HTTPException, Query, Header
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import REGISTRY
+from app.utils.profiler import profiler
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _check_key(x_api_key: str):
+    if x_api_key != "123123123":
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+
+@router.get("", summary="Prometheus scrape endpoint")
+async def metrics():
+    """All counters / gauges / histograms in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# ──────────── Sampling profiler ──────────────────────────────────────────
+
+@router.get("/profiler", summary="Profiler status and collapsed stacks")
+async def profiler_dump(x_api_key: str = Header(...)):
+    """
+    Collapsed stacks (`frame;frame;frame count` per line) collected so far –
+    pipe straight into flamegraph.pl or load in speedscope.
+    """
+    _check_key(x_api_key)
+    return PlainTextResponse(profiler.collapsed())
+
+
+@router.post("/profiler/start", summary="Start the sampling profiler")
+async def profiler_start(
+    x_api_key: str = Header(...),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Sampling interval"),
+    reset: bool = Query(True, description="Discard stacks from a previous run"),
+):
+    _check_key(x_api_key)
+    if reset:
+        profiler.reset()
+    started = profiler.start(interval_ms / 1000)
+    return {"status": "started" if started else "already running", "interval_ms": profiler.interval * 1000}
+
+
+@router.post("/profiler/stop", summary="Stop the sampling profiler")
+def profiler_stop(x_api_key: str = Header(...)):
+    # Plain `def`: stop() joins the sampler thread (up to one interval), so
+    # FastAPI runs it in the threadpool instead of on the event loop.
+    _check_key(x_api_key)
+    stopped = profiler.stop()
+    return {"status": "stopped" if stopped else "not running"}
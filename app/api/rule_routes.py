@@ -0,0 +1,34 @@
+# app/api/rule_routes.py
+# -------------------------------------------------------------------------
+#  Scanalyzer ‑ Admin side – Alert rule api
+# -------------------------------------------------------------------------
+from fastapi import APIRouter, HTTPException, Header
+
+from app.services.rule_engine import rule_engine
+
+router = APIRouter(prefix="/rules", tags=["Rules"])
+
+
+@router.get("/", summary="List the active alert rules")
+async def list_rules():
+    """Names and actions of the rules currently compiled into the engine."""
+    return {
+        "path": str(rule_engine.path),
+        "rules": [
+            {"name": r.name, "alert": r.alert, "trigger": r.trigger}
+            for r in rule_engine.ruleset.rules
+        ],
+    }
+
+
+@router.post("/reload", summary="Recompile the rules file now")
+async def reload_rules(x_api_key: str = Header(...)):
+    """
+    Rules are picked up automatically when the file changes; this forces it.
+    A broken file is rejected and the running rules stay active.
+    """
+    if x_api_key != "123123123":
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    if not rule_engine.reload():
+        raise HTTPException(status_code=422, detail="Rules file invalid – previous rules kept (see server log)")
+    return {"status": "reloaded", "rules": len(rule_engine.ruleset.rules)}
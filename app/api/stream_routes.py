@@ -1,15 +1,13 @@
 import asyncio
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Header, HTTPException
-from app.services.streamer import Streamer
+from app.services.streamer import streamer
 from app.utils.logger import setup_logger
 from app.models.log_model import LogEntry
 
 logger = setup_logger()
 stream_router = APIRouter(prefix="/streamer", tags=["Streamer"])
 
-streamer = Streamer()
-
 @stream_router.get("/ping")
 async def ping(x_api_key: str = Header(...)):  # Add header validation
     if x_api_key != "123123123":
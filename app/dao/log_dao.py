@@ -16,6 +16,7 @@ from app.db.mongodb import log_collection                # type: AsyncIOMotorCol
 from app.models.full_log import FullLogEntry
 from app.models.log_model import LogEntry
 from app.models.log_update_model import LogUpdate
+from app.utils.metrics import timed_dao
 
 
 # ────────── Insert helpers ────────────────────────────────────────────────
@@ -27,6 +28,7 @@ class LogDAO:
 
     # ------------- single insert ------------------------------------------------
     @staticmethod
+    @timed_dao("insert_one")
     async def add_log(log: FullLogEntry) -> str | None:
         """
         Insert ONE enriched log document into MongoDB.
@@ -42,6 +44,7 @@ class LogDAO:
 
     # ------------- bulk insert --------------------------------------------------
     @staticmethod
+    @timed_dao("insert_many")
     async def add_logs_bulk(logs: List[FullLogEntry]) -> int:
         """
         Insert MANY documents with `ordered=False` so duplicates are skipped.
@@ -64,6 +67,7 @@ class LogDAO:
     # ────────── Update / Delete ────────────────────────────────────────────
 
     @staticmethod
+    @timed_dao("update_one")
     async def update_log(log_id: str, changes: dict) -> bool:
         """
         Update selected fields of a log.
@@ -73,6 +77,19 @@ class LogDAO:
         return outcome.modified_count > 0
 
     @staticmethod
+    @timed_dao("update_many")
+    async def set_flags(log_ids: List[str], changes: dict) -> int:
+        """
+        Apply the same field changes (e.g. alert / trigger) to many logs at once.
+        Returns the number of documents actually modified.
+        """
+        if not log_ids:
+            return 0
+        outcome = await log_collection.update_many({"_id": {"$in": log_ids}}, {"$set": changes})
+        return outcome.modified_count
+
+    @staticmethod
+    @timed_dao("delete_one")
     async def delete_log(log_id: str) -> bool:
         outcome = await log_collection.delete_one({"_id": log_id})
         return outcome.deleted_count > 0
@@ -80,11 +97,13 @@ class LogDAO:
     # ────────── Getters ────────────────────────────────────────────────────
 
     @staticmethod
+    @timed_dao("find_one")
     async def get_log_by_id(log_id: str) -> Optional[FullLogEntry]:
         doc = await log_collection.find_one({"_id": log_id})
         return FullLogEntry(**doc) if doc else None
 
     @staticmethod
+    @timed_dao("find_filtered")
     async def get_logs_by_filter(
         agent_id: Optional[str] = None,
         channel:  Optional[str] = None,
@@ -117,6 +136,7 @@ class LogDAO:
         return results
 
     @staticmethod
+    @timed_dao("find_all")
     async def get_all_logs(skip: int = 0, limit: int = 300) -> List[FullLogEntry]:
         cursor = (
             log_collection.find()
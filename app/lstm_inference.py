@@ -15,11 +15,14 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Sequence, Union, Optional
 
+import time
+
 import torch
 from datetime import datetime
 
 from app.models.full_log import FullLogEntry
 from app.models.log_model import LogEntry
+from app.utils.metrics import MODEL_BATCH_SIZE, MODEL_FORWARD_SECONDS
 
 
 # ─────────────────────────────── Vocabulary ──────────────────────────────── #
@@ -134,7 +137,10 @@ def predict(log_line: str) -> str:
     x = vocab.encode(tokens).unsqueeze(0)  # (1, seq_len)
 
     with torch.no_grad():
+        start = time.perf_counter()
         logits = model(x)
+        MODEL_FORWARD_SECONDS.observe(time.perf_counter() - start)
+        MODEL_BATCH_SIZE.observe(x.shape[0])
         label_idx = torch.argmax(logits, dim=-1).item()
     return "anomaly" if label_idx else "normal"
 
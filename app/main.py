@@ -1,7 +1,11 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import log_routes, model_routes
+from app.api import log_routes, model_routes, metrics_routes, rule_routes
 from app.api.stream_routes import stream_router
+from app.services.correlator import correlator
+from app.utils.metrics import MetricsMiddleware
 
 #from fastapi.staticfiles import StaticFiles
 
@@ -21,11 +25,33 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(log_routes.router)
 app.include_router(stream_router)
 app.include_router(model_routes.router)
+app.include_router(metrics_routes.router)
+app.include_router(rule_routes.router)
+
+
+@app.on_event("startup")
+async def start_correlation_checkpoints():
+    app.state.checkpoint_task = asyncio.create_task(correlator.run_checkpoints())
+
+
+@app.on_event("shutdown")
+async def save_correlation_state():
+    task = getattr(app.state, "checkpoint_task", None)
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await correlator.checkpoint_async()
+
+
 @app.get("/")
 async def root():
     return {"message": "FastAPI server running!"}
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+
+
+class AlertRule(BaseModel):
+    """
+    One declarative rule. Every condition that is set must hold (AND);
+    list values inside one condition are alternatives (OR). Empty lists are
+    rejected – they would either never fire or silently match everything.
+    """
+    name: str
+    enabled: bool = True
+    event_id: Optional[List[int]] = Field(None, min_length=1)
+    provider: Optional[List[str]] = Field(None, min_length=1)           # case-insensitive
+    channel:  Optional[List[str]] = Field(None, min_length=1)           # case-insensitive
+    level:    Optional[List[str]] = Field(None, min_length=1)           # case-insensitive
+    message_contains: Optional[List[str]] = Field(None, min_length=1)   # any substring, over all message lines
+    message_regex:    Optional[List[str]] = Field(None, min_length=1)   # any pattern, no global inline flags
+    ignore_case: bool = True                                            # applies to message_contains / message_regex
+    alert:   bool = False
+    trigger: bool = False
+
+    class Config:
+        extra = "forbid"
+
+    @field_validator("event_id", "provider", "channel", "level", "message_contains", "message_regex", mode="before")
+    @classmethod
+    def _scalar_to_list(cls, value):
+        # Allow `"event_id": 4625` as shorthand for `"event_id": [4625]`
+        if value is None or isinstance(value, list):
+            return value
+        return [value]
+
+
+class AlertRuleSet(BaseModel):
+    rules: List[AlertRule]
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+
+
+class CorrelationRule(BaseModel):
+    """
+    Rate rule: at least `threshold` matching events for the same `key`
+    value within `window_seconds` (by event timestamp).
+    """
+    name: str
+    enabled: bool = True
+    event_id: List[int] = Field(min_length=1)
+    provider: Optional[List[str]] = Field(None, min_length=1)   # case-insensitive
+    key: Literal["event_host", "agent_id", "user_sid", "provider", "channel"] = "event_host"
+    window_seconds: int = Field(gt=0)
+    threshold: int = Field(ge=2)
+    slots: int = Field(60, ge=1, le=3600)          # ring-buffer resolution: window / slots
+    alert:   bool = True
+    trigger: bool = False
+
+    class Config:
+        extra = "forbid"
+
+    @field_validator("event_id", "provider", mode="before")
+    @classmethod
+    def _scalar_to_list(cls, value):
+        if value is None or isinstance(value, list):
+            return value
+        return [value]
+
+
+class CorrelationRuleSet(BaseModel):
+    rules: List[CorrelationRule]
@@ -0,0 +1,402 @@
+# app/services/correlator.py
+# --------------------------------------------------------------------------
+#  In-memory sliding-window correlation for rate-based alerts, fed from the
+#  ingest path (e.g. ≥10 × 4625 per event_host in 5 min).
+#
+#  Logs are fed only after they were stored, so a failed request leaves the
+#  windows untouched and the agent's retry counts as a first delivery; burst
+#  members are then flagged in Mongo through LogDAO.set_flags.
+#
+#  Each (rule, key value) owns a fixed-size ring of per-slot counters
+#  (array('I'), window_seconds / slots seconds per slot) plus a running
+#  total, so recording an event is O(1) and no query ever hits Mongo.
+#  Keys idle for longer than their window are evicted, and MAX_KEYS caps
+#  each rule's memory. Events stamped older than the window or more than
+#  MAX_CLOCK_SKEW ahead of the server clock are ignored, and accepted ones
+#  may lead the server clock by at most one slot (later stamps are counted
+#  at that slot), so a fast agent clock cannot push a window's head forward
+#  and expire the events already counted in it.
+#
+#  State is checkpointed (JSON Lines) every CHECKPOINT_INTERVAL seconds and on
+#  shutdown, and re-loaded at startup. Only the snapshot (raw counter bytes)
+#  is taken on the event loop, in chunks that yield between them; encoding
+#  (non-zero slots only) and the atomic write run in a worker thread.
+#
+#  Rules: correlation_rules.json next to this file, or CORRELATION_RULES_PATH.
+# --------------------------------------------------------------------------
+import asyncio
+import json
+import os
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.correlation_rule import CorrelationRule, CorrelationRuleSet
+from app.utils.logger import setup_logger
+from app.utils.metrics import counter, gauge
+
+logger = setup_logger()
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().with_name("correlation_rules.json")
+DEFAULT_STATE_PATH = Path(__file__).resolve().parent.parent.parent / "correlation_state.json"
+CHECKPOINT_INTERVAL = 30.0
+EVICT_INTERVAL = 10.0
+MAX_KEYS = 50_000
+MAX_CLOCK_SKEW = 300.0          # seconds an event may be stamped ahead of the server
+STATE_VERSION = 2
+SNAPSHOT_CHUNK = 1_000          # windows copied per event-loop turn
+
+CORRELATION_ALERTS = counter(
+    "scanalyzer_correlation_alerts", "Correlation thresholds crossed, by rule.", ("rule",),
+)
+CORRELATION_KEYS = gauge(
+    "scanalyzer_correlation_keys", "Live sliding windows, by rule.", ("rule",),
+)
+
+
+def _epoch(value) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+class SlidingWindow:
+    """
+    Ring of `slots` counters; `head` is the absolute slot number of the newest
+    slot, so the ring covers slots (head - slots, head].
+    """
+    __slots__ = ("counts", "head", "total", "recent", "firing", "touched")
+
+    def __init__(self, slots: int, keep: int):
+        self.counts = array("I", bytes(4 * slots))
+        self.head = -1
+        self.total = 0
+        self.recent: deque = deque(maxlen=keep)    # (slot, _id) of the latest events
+        self.firing = False
+        self.touched = time.time()
+
+    def add(self, slot: int, log_id: Optional[str]) -> bool:
+        """Count one event in `slot`; False if it fell outside the window or was seen already."""
+        size = len(self.counts)
+        if slot > self.head:
+            # Advance: zero every slot we skip over, at most one full lap.
+            for s in range(max(self.head + 1, slot - size + 1), slot + 1):
+                index = s % size
+                self.total -= self.counts[index]
+                self.counts[index] = 0
+            self.head = slot
+        elif slot <= self.head - size:
+            return False
+        if log_id is not None and any(i == log_id for _, i in self.recent):
+            return False                            # agent re-sent a duplicate
+        self.counts[slot % size] += 1
+        self.total += 1
+        self.recent.append((slot, log_id))
+        return True
+
+    def involved(self) -> List[str]:
+        oldest = self.head - len(self.counts)
+        return [i for s, i in self.recent if s > oldest and i is not None]
+
+    def snapshot(self) -> tuple:
+        """Cheap copy for the checkpoint thread; the counters stay raw bytes."""
+        return self.head, self.total, self.counts.tobytes(), tuple(self.recent), self.firing, self.touched
+
+    @staticmethod
+    def sparse(counts: bytes) -> List[int]:
+        """Raw counter bytes → flat [index, count, ...] of the non-zero slots."""
+        return [x for i, c in enumerate(array("I", counts)) if c for x in (i, c)]
+
+    @classmethod
+    def from_row(cls, row: list, slots: int, keep: int) -> "SlidingWindow":
+        head, total, sparse, recent, firing, touched = row
+        window = cls(slots, keep)
+        for index, count in zip(sparse[::2], sparse[1::2]):
+            window.counts[index] = count
+        window.head = head
+        window.total = total
+        window.recent.extend(tuple(r) for r in recent)
+        window.firing = firing
+        window.touched = touched
+        return window
+
+
+class _RuleState:
+    __slots__ = ("rule", "providers", "slot_width", "max_lead", "changes", "windows")
+
+    def __init__(self, rule: CorrelationRule):
+        self.rule = rule
+        self.providers = frozenset(p.casefold() for p in rule.provider) if rule.provider else None
+        self.slot_width = rule.window_seconds / rule.slots
+        self.max_lead = min(MAX_CLOCK_SKEW, self.slot_width)     # how far the head may run ahead of "now"
+        changes = {}
+        if rule.alert:
+            changes["alert"] = True
+        if rule.trigger:
+            changes["trigger"] = True
+        self.changes: Tuple[Tuple[str, bool], ...] = tuple(sorted(changes.items()))
+        # Insertion-ordered; a touched key is re-inserted at the end, so the
+        # least recently touched keys are always at the front.
+        self.windows: Dict[str, SlidingWindow] = {}
+
+    def signature(self) -> list:
+        return [self.rule.window_seconds, self.rule.slots, self.rule.threshold]
+
+
+class CorrelationOutcome:
+    """What the caller still has to do after `observe_batch`: flag stored logs, announce bursts."""
+    __slots__ = ("updates", "alerts", "_seen")
+
+    def __init__(self):
+        # {"alert": True, ...} (as a sorted tuple of items) → _ids of stored events
+        self.updates: Dict[Tuple[Tuple[str, bool], ...], List[str]] = {}
+        self.alerts: List[dict] = []
+        self._seen: Dict[Tuple[Tuple[str, bool], ...], set] = {}
+
+    def flag(self, changes: Tuple[Tuple[str, bool], ...], log_id: str):
+        seen = self._seen.setdefault(changes, set())
+        if log_id not in seen:
+            seen.add(log_id)
+            self.updates.setdefault(changes, []).append(log_id)
+
+    def __bool__(self):
+        return bool(self.updates or self.alerts)
+
+
+class CorrelationEngine:
+
+    def __init__(self, rules: List[CorrelationRule], state_path: Optional[Path] = None,
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL, max_keys: int = MAX_KEYS):
+        self.state_path = state_path
+        self.checkpoint_interval = checkpoint_interval
+        self.max_keys = max_keys
+        self._write_lock = threading.Lock()        # a periodic write may still be running at shutdown
+        self.rules: Dict[str, _RuleState] = {r.name: _RuleState(r) for r in rules if r.enabled}
+        self.by_event: Dict[int, List[_RuleState]] = {}
+        for state in self.rules.values():
+            for event_id in state.rule.event_id:
+                self.by_event.setdefault(event_id, []).append(state)
+        self._next_evict = time.monotonic() + EVICT_INTERVAL
+        self.restore()
+
+    # ────────── Hot path ──────────────────────────────────────────────────
+
+    def observe_batch(self, logs: List[dict]) -> CorrelationOutcome:
+        """
+        Feed logs that have just been stored. While a (rule, key) window is at
+        or above its threshold, each new event – and, on the crossing, every
+        earlier event still in the window – is returned in `outcome.updates`
+        for `LogDAO.set_flags`; one stream message per crossing goes into
+        `outcome.alerts`. Events without an `_id` are counted but cannot be flagged.
+        """
+        outcome = CorrelationOutcome()
+        if not self.by_event:
+            return outcome
+        wall = time.time()
+
+        for log in logs:
+            states = self.by_event.get(log.get("event_id"))
+            if not states:
+                continue
+            ts = _epoch(log.get("timestamp"))
+            if ts is None:
+                continue
+            log_id = log.get("_id")
+
+            for state in states:
+                rule = state.rule
+                if state.providers is not None and (log.get("provider") or "").casefold() not in state.providers:
+                    continue
+                key = log.get(rule.key)
+                if not key:
+                    continue
+                if ts > wall + MAX_CLOCK_SKEW or ts <= wall - rule.window_seconds:
+                    continue                                     # stale, or a clock far in the future
+
+                window = state.windows.pop(key, None)
+                if window is None:
+                    window = SlidingWindow(rule.slots, rule.threshold)
+                state.windows[key] = window                      # move to the back (most recent)
+                window.touched = wall
+                if not window.add(int(min(ts, wall + state.max_lead) // state.slot_width), log_id):
+                    continue
+
+                if window.total < rule.threshold:
+                    window.firing = False
+                    continue
+
+                if window.firing:
+                    if state.changes and log_id is not None:
+                        outcome.flag(state.changes, log_id)
+                    continue
+                window.firing = True
+                involved = window.involved()
+                if state.changes:
+                    for event_id in involved:
+                        outcome.flag(state.changes, event_id)
+                outcome.alerts.append({
+                    "type": "correlation_alert",
+                    "rule": rule.name,
+                    "key": rule.key,
+                    "value": key,
+                    "count": window.total,
+                    "threshold": rule.threshold,
+                    "window_seconds": rule.window_seconds,
+                    "event_ids": involved,
+                    "alert": rule.alert,
+                    "trigger": rule.trigger,
+                })
+                CORRELATION_ALERTS.inc(rule=rule.name)
+
+        now = time.monotonic()
+        if now >= self._next_evict:
+            self._next_evict = now + EVICT_INTERVAL
+            self.evict()
+        return outcome
+
+    # ────────── Housekeeping ──────────────────────────────────────────────
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Drop windows untouched for longer than their window, and trim to max_keys."""
+        now = now or time.time()
+        dropped = 0
+        for name, state in self.rules.items():
+            windows = state.windows
+            cutoff = now - state.rule.window_seconds
+            # Oldest-touched first, so we can stop at the first live key.
+            for key in list(windows):
+                if windows[key].touched >= cutoff and len(windows) <= self.max_keys:
+                    break
+                del windows[key]
+                dropped += 1
+            CORRELATION_KEYS.set(len(windows), rule=name)
+        return dropped
+
+    def reset(self):
+        """Forget every window (the checkpoint file is left alone)."""
+        for state in self.rules.values():
+            state.windows.clear()
+
+    # ────────── Checkpoints ───────────────────────────────────────────────
+
+    def snapshot(self) -> Dict[str, tuple]:
+        """Copy every window as raw values; must run on the thread that feeds events."""
+        return {
+            name: (s.signature(), [(k, *w.snapshot()) for k, w in s.windows.items()])
+            for name, s in self.rules.items()
+        }
+
+    async def snapshot_async(self) -> Dict[str, tuple]:
+        """`snapshot`, yielding to the event loop every SNAPSHOT_CHUNK windows."""
+        snapshot = {}
+        for name, s in self.rules.items():
+            items = list(s.windows.items())              # ingest may re-order the dict meanwhile
+            rows = []
+            for start in range(0, len(items), SNAPSHOT_CHUNK):
+                rows.extend((k, *w.snapshot()) for k, w in items[start:start + SNAPSHOT_CHUNK])
+                await asyncio.sleep(0)
+            snapshot[name] = (s.signature(), rows)
+        return snapshot
+
+    def _write(self, path: Path, snapshot: Dict[str, tuple]) -> bool:
+        # JSON Lines: a header {"version", "rules": {name: signature}}, then one
+        # [rule, key, head, total, [slot, count, ...] (non-zero only), recent, firing, touched]
+        # per window. Encoding line by line lets the event loop take the GIL in between.
+        dumps, sparse = json.dumps, SlidingWindow.sparse
+        header = {"version": STATE_VERSION, "rules": {name: sig for name, (sig, _) in snapshot.items()}}
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with self._write_lock:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(dumps(header) + "\n")
+                    for name, (_, rows) in snapshot.items():
+                        for key, head, total, counts, recent, firing, touched in rows:
+                            f.write(dumps([name, key, head, total, sparse(counts), recent, firing, touched],
+                                          separators=(",", ":")) + "\n")
+                os.replace(tmp, path)                            # atomic on POSIX and Windows
+        except (OSError, TypeError, ValueError) as exc:
+            logger.error(f"Correlation checkpoint failed ({path}): {exc}")
+            return False
+        return True
+
+    def checkpoint(self) -> bool:
+        """Synchronous checkpoint (tests, scripts); the app uses `checkpoint_async`."""
+        if not self.state_path:
+            return False
+        return self._write(self.state_path, self.snapshot())
+
+    async def checkpoint_async(self) -> bool:
+        """Snapshot on the event loop, encode and write in a worker thread."""
+        if not self.state_path:
+            return False
+        snapshot = await self.snapshot_async()
+        return await asyncio.to_thread(self._write, self.state_path, snapshot)
+
+    async def run_checkpoints(self):
+        """Background task: checkpoint every `checkpoint_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await self.checkpoint_async()
+
+    def restore(self) -> int:
+        """Load a checkpoint; windows of rules whose window/slots/threshold changed are discarded."""
+        if not self.state_path or not self.state_path.exists():
+            return 0
+        try:
+            restored = 0
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != STATE_VERSION:
+                    raise ValueError(f"unsupported state version {header.get('version')!r}")
+                live = {
+                    name: state for name, state in self.rules.items()
+                    if header["rules"].get(name) == state.signature()
+                }
+                for line in f:
+                    name, key, *row = json.loads(line)
+                    state = live.get(name)
+                    if state is None:
+                        continue
+                    state.windows[key] = SlidingWindow.from_row(row, state.rule.slots, state.rule.threshold)
+                    restored += 1
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, IndexError, OverflowError) as exc:
+            logger.error(f"Correlation state not restored ({self.state_path}): {exc}")
+            for state in self.rules.values():
+                state.windows.clear()
+            return 0
+        logger.info(f"Correlation state restored: {restored} window(s).")
+        self.evict()
+        return restored
+
+
+def load_correlation_rules(path: Path) -> List[CorrelationRule]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return CorrelationRuleSet(**json.load(f)).rules
+    except (OSError, ValueError, ValidationError) as exc:
+        logger.error(f"Correlation rules not loaded ({path}): {exc}")
+        return []
+
+
+def _path_from_env(name: str, default: Path) -> Path:
+    path = os.getenv(name)
+    return Path(path) if path else default
+
+
+correlator = CorrelationEngine(
+    load_correlation_rules(_path_from_env("CORRELATION_RULES_PATH", DEFAULT_RULES_PATH)),
+    state_path=_path_from_env("CORRELATION_STATE_PATH", DEFAULT_STATE_PATH),
+)
@@ -1,22 +1,39 @@
 # app/services/log_processor
+from typing import List
+
 from app.models.full_log import FullLogEntry
+from app.services.rule_engine import rule_engine
 from app.utils.event_mapper import get_event_description
 
 #Add the ML Classifier Import first
 
 class LogProcessor:
     @staticmethod
-    async def process(log_data: dict) -> dict:
+    def _enrich(log_data: dict) -> dict:
         """
         Enrich the log without discarding existing data.
         """
         # Simulated enrichment process
         enriched_data = {
-            "description": get_event_description(log_data["event_id"]),
+            "description": get_event_description(log_data["event_id"], log_data.get("provider")),
             "ai_classification": "Normal",  # Example AI classification
-            "alert": False,                # Example alert logic
-            "trigger": False,              # Example trigger logic
+            "alert": False,                # Set by the rule engine below
+            "trigger": False,              # Set by the rule engine below
         }
 
         # Return the merged log data
-        return {**log_data, **enriched_data}
\ No newline at end of file
+        return {**log_data, **enriched_data}
+
+    @staticmethod
+    async def process(log_data: dict) -> dict:
+        """
+        Enrich one log and evaluate the alert rules on it.
+        """
+        return rule_engine.apply(LogProcessor._enrich(log_data))
+
+    @staticmethod
+    async def process_batch(logs: List[dict]) -> List[dict]:
+        """
+        Bulk version of `process` – rules are evaluated once over the whole batch.
+        """
+        return rule_engine.apply_batch([LogProcessor._enrich(log) for log in logs])
@@ -0,0 +1,252 @@
+# app/services/rule_engine.py
+# --------------------------------------------------------------------------
+#  Declarative alert / trigger rules, compiled for the ingest hot path.
+#
+#  Rules (see alert_rules.json next to this file, or ALERT_RULES_PATH) are
+#  compiled into:
+#    • a dispatch table  event_id → bucket of candidate rules, with rules that
+#      have no event_id condition merged into every bucket (and into the
+#      fallback bucket for unlisted IDs), so a log only ever looks at rules
+#      that can possibly apply to its event_id;
+#    • per bucket, combined regexes over every message pattern in that
+#      bucket. The stdlib has no Aho-Corasick, so these alternations are the
+#      multi-pattern prefilter: C-level passes that, for the usual benign
+#      log, rule out every message rule at once. Only on a hit are the
+#      individual rules' patterns checked.
+#
+#  The rules file's mtime is polled at most every RELOAD_INTERVAL seconds;
+#  a changed file is recompiled and swapped in, a broken one is rejected
+#  and the previous rules keep running.
+# --------------------------------------------------------------------------
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from pydantic import ValidationError
+
+from app.models.alert_rule import AlertRule, AlertRuleSet
+from app.utils.logger import setup_logger
+from app.utils.metrics import RULE_MATCHES
+
+logger = setup_logger()
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().with_name("alert_rules.json")
+RELOAD_INTERVAL = 5.0
+
+
+class RuleCompileError(ValueError):
+    """Rules file could not be read, validated or compiled."""
+
+
+def _fold(values: Optional[List[str]]) -> Optional[frozenset]:
+    return frozenset(v.casefold() for v in values) if values else None
+
+
+def _alternation(parts: List[str]) -> Optional[str]:
+    return "|".join(parts) if parts else None
+
+
+def _compile(rule: AlertRule, source: Optional[str]) -> Optional[Pattern]:
+    try:
+        return re.compile(source) if source else None
+    except re.error as exc:
+        raise RuleCompileError(f"Rule '{rule.name}': bad message pattern: {exc}") from exc
+
+
+class CompiledRule:
+    """
+    Message conditions are split in two, because sre is several times slower
+    on case-insensitive literal alternations than on plain ones:
+
+    * `folded` – case-insensitive substrings, lower-cased, searched in the
+                 lower-cased message;
+    * `exact`  – regexes (wrapped in a scoped `(?i:…)` when ignore_case) and
+                 case-sensitive substrings, searched in the message as-is.
+    """
+    __slots__ = ("name", "providers", "channels", "levels", "folded_source", "folded",
+                 "exact_source", "exact", "has_message", "prefiltered", "alert", "trigger")
+
+    def __init__(self, rule: AlertRule):
+        self.name = rule.name
+        self.providers = _fold(rule.provider)
+        self.channels = _fold(rule.channel)
+        self.levels = _fold(rule.level)
+
+        contains = rule.message_contains or []
+        regexes = [f"(?:{p})" for p in rule.message_regex or ()]
+        if rule.ignore_case:
+            self.folded_source = _alternation([re.escape(s.lower()) for s in contains])
+            self.exact_source = f"(?i:{'|'.join(regexes)})" if regexes else None
+        else:
+            self.folded_source = None
+            self.exact_source = _alternation([re.escape(s) for s in contains] + regexes)
+        self.folded = _compile(rule, self.folded_source)
+        self.exact = _compile(rule, self.exact_source)
+        self.has_message = self.folded is not None or self.exact is not None
+        # Capture groups (and so backreferences) would be renumbered inside the
+        # bucket-wide alternation; such patterns are always checked on their own.
+        self.prefiltered = self.exact is None or self.exact.groups == 0
+        self.alert = rule.alert
+        self.trigger = rule.trigger
+
+    def matches_fields(self, log: dict) -> bool:
+        if self.providers is not None and (log.get("provider") or "").casefold() not in self.providers:
+            return False
+        if self.channels is not None and (log.get("channel") or "").casefold() not in self.channels:
+            return False
+        if self.levels is not None and (log.get("level") or "").casefold() not in self.levels:
+            return False
+        return True
+
+
+class _Bucket:
+    __slots__ = ("rules", "needs_text", "folded_prefilter", "exact_prefilter")
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = tuple(rules)
+        self.needs_text = any(r.has_message for r in rules)
+        folded = _alternation([r.folded_source for r in rules if r.folded_source])
+        exact = _alternation([r.exact_source for r in rules if r.exact_source and r.prefiltered])
+        self.folded_prefilter: Optional[Pattern] = re.compile(folded) if folded else None
+        self.exact_prefilter: Optional[Pattern] = re.compile(exact) if exact else None
+
+
+class CompiledRuleSet:
+    """Immutable once built; the engine swaps whole instances on reload."""
+
+    def __init__(self, rules: Iterable[AlertRule]):
+        pairs = [(CompiledRule(r), r.event_id) for r in rules if r.enabled]
+        self.rules = tuple(rule for rule, _ in pairs)
+
+        # Rules without an event_id condition join every bucket; definition
+        # order is kept inside each bucket.
+        by_event: Dict[int, List[CompiledRule]] = {eid: [] for _, ids in pairs for eid in ids or ()}
+        for rule, ids in pairs:
+            for event_id in (by_event if ids is None else ids):
+                by_event[event_id].append(rule)
+
+        self.by_event: Dict[int, _Bucket] = {eid: _Bucket(rs) for eid, rs in by_event.items()}
+        self.fallback = _Bucket([rule for rule, ids in pairs if ids is None])
+
+    def evaluate(self, log: dict) -> Tuple[bool, bool, List[str]]:
+        """Returns (alert, trigger, names of matched rules)."""
+        bucket = self.by_event.get(log.get("event_id"), self.fallback)
+        if not bucket.rules:
+            return False, False, []
+
+        text = lowered = None
+        folded_hit = exact_hit = False
+        if bucket.needs_text:
+            text = "\n".join(log.get("message") or ())
+            if bucket.folded_prefilter is not None:
+                lowered = text.lower()
+                folded_hit = bucket.folded_prefilter.search(lowered) is not None
+            if bucket.exact_prefilter is not None:
+                exact_hit = bucket.exact_prefilter.search(text) is not None
+
+        alert = trigger = False
+        matched: List[str] = []
+        for rule in bucket.rules:
+            if rule.has_message:
+                # Cheap rejection first: neither prefilter saw anything for this rule.
+                if not ((rule.folded is not None and folded_hit)
+                        or (rule.exact is not None and (exact_hit or not rule.prefiltered))):
+                    continue
+                if not rule.matches_fields(log):
+                    continue
+                if not ((rule.folded is not None and rule.folded.search(lowered) is not None)
+                        or (rule.exact is not None and rule.exact.search(text) is not None)):
+                    continue
+            elif not rule.matches_fields(log):
+                continue
+            matched.append(rule.name)
+            alert = alert or rule.alert
+            trigger = trigger or rule.trigger
+        return alert, trigger, matched
+
+
+def load_rules(path: Path) -> CompiledRuleSet:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            ruleset = AlertRuleSet(**json.load(f))
+    except (OSError, ValueError, ValidationError) as exc:
+        raise RuleCompileError(f"Cannot load rules from {path}: {exc}") from exc
+    names = [r.name for r in ruleset.rules]
+    if len(names) != len(set(names)):
+        raise RuleCompileError(f"Duplicate rule names in {path}")
+    return CompiledRuleSet(ruleset.rules)
+
+
+class RuleEngine:
+
+    def __init__(self, path: Path = DEFAULT_RULES_PATH, reload_interval: float = RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.ruleset = CompiledRuleSet([])
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.reload()
+
+    def reload(self) -> bool:
+        """Recompile from `path`; on failure the running rules are kept."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError as exc:
+            logger.error(f"Alert rules not reloaded: {exc}")
+            return False
+        try:
+            ruleset = load_rules(self.path)
+        except RuleCompileError as exc:
+            logger.error(f"Alert rules not reloaded: {exc}")
+            self._mtime = mtime                     # do not retry the same broken file on every poll
+            return False
+        self.ruleset, self._mtime = ruleset, mtime
+        logger.info(f"Alert rules loaded: {len(ruleset.rules)} active rule(s) from {self.path}.")
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def apply(self, log: dict) -> dict:
+        """Set `alert` / `trigger` on one enriched log in place (never clears a flag)."""
+        return self.apply_batch([log])[0]
+
+    def apply_batch(self, logs: List[dict]) -> List[dict]:
+        """
+        Evaluate a whole batch with one reload check and one ruleset snapshot,
+        instead of paying both per log.
+        """
+        self._maybe_reload()
+        ruleset = self.ruleset
+        if not ruleset.rules:
+            return logs
+        evaluate = ruleset.evaluate
+        for log in logs:
+            alert, trigger, matched = evaluate(log)
+            if alert:
+                log["alert"] = True
+            if trigger:
+                log["trigger"] = True
+            for name in matched:
+                RULE_MATCHES.inc(rule=name)
+        return logs
+
+
+def _rules_path_from_env() -> Path:
+    path = os.getenv("ALERT_RULES_PATH")
+    return Path(path) if path else DEFAULT_RULES_PATH
+
+
+rule_engine = RuleEngine(_rules_path_from_env())
@@ -5,8 +5,11 @@ from starlette.websockets import WebSocket
 from app.services.log_processor import LogProcessor
 import app.utils.logger as logger
 import json
+import time
 from fastapi.encoders import jsonable_encoder
 
+from app.utils.metrics import BROADCAST_MESSAGES, BROADCAST_SECONDS, STREAM_CLIENTS
+
 logger = logger.setup_logger()
 class Streamer:
 
@@ -18,17 +21,20 @@ class Streamer:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        STREAM_CLIENTS.set(len(self.active_connections))
         logger.info("WebSocket client connected.")
 
     async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            STREAM_CLIENTS.set(len(self.active_connections))
             logger.info("WebSocket client disconnected.")
 
     async def broadcast(self, message: dict):
         """
         Broadcast a message to all active WebSocket clients.
         """
+        start = time.perf_counter()
         inactive_connections = []
         for conn in self.active_connections:
             try:
@@ -38,6 +44,10 @@ class Streamer:
             except Exception as e:
                 logger.error(f"Failed to send message: {e}")
                 inactive_connections.append(conn)
+        BROADCAST_SECONDS.observe(time.perf_counter() - start)
+        BROADCAST_MESSAGES.inc(len(self.active_connections) - len(inactive_connections), outcome="sent")
+        if inactive_connections:
+            BROADCAST_MESSAGES.inc(len(inactive_connections), outcome="failed")
 
     # Cleanup inactive/disconnected connections
         for conn in inactive_connections:
@@ -48,4 +58,9 @@ class Streamer:
 
     async def toggle_pause(self, pause: bool):
         self.is_paused = pause
-        logger.info(f"Stream {'paused' if pause else 'resumed'}.")
\ No newline at end of file
+        logger.info(f"Stream {'paused' if pause else 'resumed'}.")
+
+
+# One shared instance: the stream routes and the ingest path (correlation
+# alerts) broadcast to the same set of connected clients.
+streamer = Streamer()
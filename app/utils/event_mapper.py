@@ -0,0 +1,154 @@
+# app/utils/event_mapper.py
+# --------------------------------------------------------------------------
+#  Event-ID → human description lookup used by LogProcessor enrichment.
+#
+#  The packaged catalog (event_descriptions.json, next to this file) is read
+#  ONCE and flattened into a single dict keyed by (provider, event_id), so a
+#  lookup is one or two dict hits – no scans, no file reads per log.
+#
+#  Local additions / corrections go into an overrides file with the same
+#  shape, pointed to by EVENT_DESCRIPTIONS_OVERRIDES. Its mtime is checked
+#  at most every RELOAD_INTERVAL seconds and the tables are rebuilt and
+#  swapped in atomically when it changes – no restart needed.
+# --------------------------------------------------------------------------
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger()
+
+CATALOG_PATH = Path(__file__).resolve().with_name("event_descriptions.json")
+RELOAD_INTERVAL = 5.0
+
+Key = Tuple[str, int]
+
+
+def _read(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class EventCatalog:
+    """
+    Immutable-per-generation lookup tables:
+
+    * `_by_key`  – (provider, event_id) → description, stored under the exact
+                   provider name, its casefolded form, and every alias.
+    * `_by_id`   – event_id → description, only for IDs whose description is
+                   unambiguous across providers (used only when the provider is
+                   missing – an unknown provider's IDs mean something else).
+    """
+
+    def __init__(self, catalog_path: Path = CATALOG_PATH, overrides_path: Optional[Path] = None,
+                 reload_interval: float = RELOAD_INTERVAL):
+        self.catalog_path = catalog_path
+        self.overrides_path = overrides_path
+        self.reload_interval = reload_interval
+        self._base = _read(catalog_path)
+        self._overrides_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._by_key: Dict[Key, str] = {}
+        self._by_id: Dict[int, str] = {}
+        self.reload()
+
+    # ────────── Building ──────────────────────────────────────────────────
+
+    def _build(self, *sources: dict) -> Tuple[Dict[Key, str], Dict[int, str]]:
+        providers: Dict[str, Dict[int, str]] = {}
+        aliases: Dict[str, str] = {}
+        for source in sources:
+            aliases.update(source.get("aliases", {}))
+            for provider, events in source.get("providers", {}).items():
+                target = providers.setdefault(provider, {})
+                for event_id, description in events.items():
+                    target[int(event_id)] = description
+
+        by_key: Dict[Key, str] = {}
+        candidates: Dict[int, set] = {}
+        for provider, events in providers.items():
+            names = {provider, provider.casefold()}
+            names.update(a for a, canonical in aliases.items() if canonical == provider)
+            names.update({n.casefold() for n in names})
+            for event_id, description in events.items():
+                description = sys.intern(description)
+                for name in names:
+                    by_key[(name, event_id)] = description
+                candidates.setdefault(event_id, set()).add(description)
+
+        by_id = {eid: next(iter(descs)) for eid, descs in candidates.items() if len(descs) == 1}
+        return by_key, by_id
+
+    def reload(self) -> bool:
+        """
+        Rebuild tables from the packaged catalog plus the overrides file.
+        On a broken overrides file (unreadable, not JSON, or the wrong shape)
+        the previous tables stay in place – or, on the very first load, the
+        packaged catalog alone is used – and the file is not retried until
+        its mtime changes again.
+        """
+        sources = [self._base]
+        mtime = None
+        try:
+            if self.overrides_path and self.overrides_path.exists():
+                mtime = self.overrides_path.stat().st_mtime
+                sources.append(_read(self.overrides_path))
+            # Build first, then swap both references – readers never see a half-built table.
+            by_key, by_id = self._build(*sources)
+        except (OSError, TypeError, ValueError, AttributeError) as exc:
+            logger.error(f"Event description overrides not loaded ({self.overrides_path}): {exc}")
+            self._overrides_mtime = mtime
+            if not self._by_key:
+                self._by_key, self._by_id = self._build(self._base)
+            return False
+        self._by_key, self._by_id = by_key, by_id
+        self._overrides_mtime = mtime
+        logger.info(f"Event description catalog loaded: {len(self._by_id)} unique IDs, {len(sources) - 1} override file(s).")
+        return True
+
+    def _maybe_reload(self, now: float):
+        self._next_check = now + self.reload_interval
+        if not self.overrides_path:
+            return
+        try:
+            mtime = self.overrides_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._overrides_mtime:
+            self.reload()
+
+    # ────────── Lookup ────────────────────────────────────────────────────
+
+    def lookup(self, event_id: int, provider: Optional[str] = None) -> Optional[str]:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._maybe_reload(now)
+
+        if not provider:
+            return self._by_id.get(event_id)
+        description = self._by_key.get((provider, event_id))
+        if description is None:
+            description = self._by_key.get((provider.casefold(), event_id))
+        return description
+
+
+def _overrides_from_env() -> Optional[Path]:
+    path = os.getenv("EVENT_DESCRIPTIONS_OVERRIDES")
+    return Path(path) if path else None
+
+
+catalog = EventCatalog(overrides_path=_overrides_from_env())
+
+
+def get_event_description(event_id: int, provider: Optional[str] = None) -> Optional[str]:
+    """Description for `event_id` from `provider`, or None if we have none."""
+    return catalog.lookup(event_id, provider)
+
+
+def reload_event_catalog() -> bool:
+    """Force an immediate rebuild (e.g. from an admin endpoint or a signal handler)."""
+    return catalog.reload()
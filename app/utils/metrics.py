@@ -0,0 +1,282 @@
+# app/utils/metrics.py
+# --------------------------------------------------------------------------
+#  Minimal in-process metrics (counters, gauges, histograms) rendered in the
+#  Prometheus text exposition format by GET /metrics.
+#  Hand-rolled so the hot path is a dict lookup + bisect + lock, and so we
+#  do not pull in a client library just for a handful of series.
+# --------------------------------------------------------------------------
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds: 100 µs … 10 s, wide enough for a dict lookup and a bulk Mongo write.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> LabelValues:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        family = f"{self.name}_total"
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{family}{_fmt_labels(self.labelnames, key)} {_fmt_num(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_num(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts…, +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager: `with HIST.time(route="/x"): ...`"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        bounds = [*self.buckets, float("inf")]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(bounds, series):
+                cumulative += hits
+                le = f'le="{_fmt_num(bound)}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _fmt_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt_num(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_hist", "_labels", "_start")
+
+    def __init__(self, hist: Histogram, labels: dict):
+        self._hist = hist
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+
+# ────────── Scanalyzer series ─────────────────────────────────────────────
+
+HTTP_REQUEST_SECONDS = histogram(
+    "scanalyzer_http_request_seconds", "HTTP request handling time by route template.",
+    ("method", "route", "status"),
+)
+INGEST_STAGE_SECONDS = histogram(
+    "scanalyzer_ingest_stage_seconds",
+    "Time spent per ingest stage (dump, process, validate, store, correlate); body parsing is the rest of the request.",
+    ("route", "stage"),
+)
+DAO_SECONDS = histogram(
+    "scanalyzer_dao_seconds", "LogDAO call duration by operation.", ("operation",),
+)
+DAO_ERRORS = counter(
+    "scanalyzer_dao_errors", "LogDAO calls that raised, by operation.", ("operation",),
+)
+MODEL_FORWARD_SECONDS = histogram(
+    "scanalyzer_model_forward_seconds", "LSTM forward pass duration.",
+)
+MODEL_BATCH_SIZE = histogram(
+    "scanalyzer_model_batch_size", "Rows per LSTM forward pass.", buckets=SIZE_BUCKETS,
+)
+BROADCAST_SECONDS = histogram(
+    "scanalyzer_stream_broadcast_seconds", "Streamer.broadcast fan-out duration.",
+)
+BROADCAST_MESSAGES = counter(
+    "scanalyzer_stream_messages", "WebSocket messages sent by outcome.", ("outcome",),
+)
+STREAM_CLIENTS = gauge(
+    "scanalyzer_stream_clients", "Currently connected WebSocket clients.",
+)
+STREAM_CLIENTS.set(0)
+RULE_MATCHES = counter(
+    "scanalyzer_rule_matches", "Logs matched per alert rule.", ("rule",),
+)
+
+
+def timed_dao(operation: str):
+    """Decorator for async LogDAO methods: duration + error count per operation."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                DAO_ERRORS.inc(operation=operation)
+                raise
+            finally:
+                DAO_SECONDS.observe(time.perf_counter() - start, operation=operation)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task overhead) that times every
+    HTTP request and labels it with the matched route *template*, so
+    `/logs/{log_id}` stays one series instead of one per id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status["code"]),
+            )
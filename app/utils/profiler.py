@@ -0,0 +1,83 @@
+# app/utils/profiler.py
+# --------------------------------------------------------------------------
+#  Opt-in sampling profiler, switched on/off at runtime via /metrics/profiler.
+#  A daemon thread snapshots every thread's stack with sys._current_frames()
+#  and counts them in "collapsed" form (root;…;leaf N), which flamegraph.pl
+#  and speedscope read directly. Costs nothing while stopped.
+# --------------------------------------------------------------------------
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from app.utils.metrics import counter
+
+PROFILER_SAMPLES = counter("scanalyzer_profiler_samples", "Stacks captured by the sampling profiler.")
+
+MAX_DEPTH = 64
+
+
+class SamplingProfiler:
+
+    def __init__(self):
+        self._stacks: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01) -> bool:
+        """Start sampling every `interval` seconds. Returns False if already running."""
+        if self.running:
+            return False
+        self.interval = interval
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="scanalyzer-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> bool:
+        if not self.running:
+            return False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+
+    def collapsed(self) -> str:
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            batch = []
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                parts = []
+                while frame is not None and len(parts) < MAX_DEPTH:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                batch.append(";".join(reversed(parts)))
+            del frames
+            with self._lock:
+                self._stacks.update(batch)
+            PROFILER_SAMPLES.inc(len(batch))
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,135 @@
+# bench/generator.py
+# --------------------------------------------------------------------------
+#  Synthetic Windows event generator for the benchmark suite.
+#  Produces dicts shaped exactly like the `LogEntry` payload the user agent
+#  posts, with a deterministic seed so two runs send the same traffic.
+# --------------------------------------------------------------------------
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# (channel, provider, event_id, level, level_code, message template, weight)
+# Weights roughly follow what a domain-joined workstation emits in a day.
+_TEMPLATES: List[Tuple[str, str, int, str, int, List[str], int]] = [
+    ("Security", "Microsoft-Windows-Security-Auditing", 4624, "Information", 4,
+     ["An account was successfully logged on.", "Subject: {sid}", "Logon Type: {logon_type}",
+      "Account Name: {user}", "Workstation Name: {host}", "Source Network Address: {ip}"], 30),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4625, "Information", 4,
+     ["An account failed to log on.", "Logon Type: {logon_type}", "Account Name: {user}",
+      "Failure Reason: Unknown user name or bad password.", "Source Network Address: {ip}"], 6),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4634, "Information", 4,
+     ["An account was logged off.", "Account Name: {user}", "Logon Type: {logon_type}"], 20),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4672, "Information", 4,
+     ["Special privileges assigned to new logon.", "Account Name: {user}",
+      "Privileges: SeDebugPrivilege SeBackupPrivilege SeRestorePrivilege"], 8),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4688, "Information", 4,
+     ["A new process has been created.", "Creator Subject: {sid}",
+      "New Process Name: {image}", "Process Command Line: {cmdline}"], 12),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4720, "Information", 4,
+     ["A user account was created.", "Subject: {sid}", "New Account Name: {user}"], 1),
+    ("Security", "Microsoft-Windows-Security-Auditing", 4740, "Information", 4,
+     ["A user account was locked out.", "Account Name: {user}", "Caller Computer Name: {host}"], 1),
+    ("System", "Service Control Manager", 7045, "Information", 4,
+     ["A service was installed in the system.", "Service Name: {service}",
+      "Service File Name: {image}", "Service Type: user mode service"], 1),
+    ("System", "Service Control Manager", 7036, "Information", 4,
+     ["The {service} service entered the running state."], 6),
+    ("System", "EventLog", 6005, "Information", 4, ["The Event log service was started."], 1),
+    ("System", "EventLog", 6006, "Information", 4, ["The Event log service was stopped."], 1),
+    ("System", "User32", 1074, "Information", 4,
+     ["The process {image} has initiated the restart of computer {host} on behalf of user {user}."], 1),
+    ("System", "Microsoft-Windows-Kernel-Power", 41, "Critical", 1,
+     ["The system has rebooted without cleanly shutting down first."], 1),
+    ("Microsoft-Windows-Sysmon/Operational", "Microsoft-Windows-Sysmon", 1, "Information", 4,
+     ["Process Create:", "Image: {image}", "CommandLine: {cmdline}", "User: {host}\\{user}"], 6),
+    ("Microsoft-Windows-Sysmon/Operational", "Microsoft-Windows-Sysmon", 3, "Information", 4,
+     ["Network connection detected:", "Image: {image}", "DestinationIp: {ip}", "DestinationPort: 443"], 5),
+    ("Microsoft-Windows-Sysmon/Operational", "Microsoft-Windows-Sysmon", 11, "Information", 4,
+     ["File created:", "Image: {image}", "TargetFilename: C:\\Users\\{user}\\AppData\\Local\\Temp\\{tmp}.tmp"], 4),
+    ("Application", "Application Error", 1000, "Error", 2,
+     ["Faulting application name: {exe}", "Exception code: 0xc0000005"], 2),
+    ("Application", "Windows Error Reporting", 1001, "Information", 4,
+     ["Fault bucket , type 0", "Event Name: APPCRASH", "P1: {exe}"], 2),
+]
+
+_USERS    = ["administrator", "jdoe", "asmith", "svc_backup", "svc_sql", "helpdesk", "mlopez", "kwang"]
+_IMAGES   = ["C:\\Windows\\System32\\cmd.exe", "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+             "C:\\Windows\\explorer.exe", "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+             "C:\\Windows\\System32\\svchost.exe", "C:\\Windows\\System32\\rundll32.exe"]
+_CMDLINES = ["cmd.exe /c whoami", "powershell.exe -NoProfile -ExecutionPolicy Bypass",
+             "svchost.exe -k netsvcs -p", "rundll32.exe shell32.dll,Control_RunDLL", "explorer.exe"]
+_SERVICES = ["Windows Update", "Print Spooler", "BITS", "WinRM", "PSEXESVC", "Remote Registry"]
+
+
+class EventGenerator:
+    """
+    Deterministic stream of `LogEntry`-shaped dicts.
+
+    Every (agent_id, channel) pair keeps its own monotonically increasing
+    record_id, so `_id` values are unique exactly like the real agent's.
+
+    With an explicit `start`, timestamps follow a simulated clock (1–250 ms
+    per event). Without one they follow the wall clock, because the
+    correlator ignores events that fall outside its window around "now".
+    """
+
+    def __init__(self, seed: int = 1337, agents: int = 8, start: Optional[datetime] = None):
+        self._rng = random.Random(seed)
+        self._agents = [(f"agent-{i:03d}", f"WS-{i:03d}.corp.local") for i in range(agents)]
+        self._weights = [t[-1] for t in _TEMPLATES]
+        self._record_ids: Dict[Tuple[str, str], int] = {}
+        self._clock = start
+
+    def _fill(self, line: str, host: str, user: str, sid: str) -> str:
+        rng = self._rng
+        return line.format(
+            sid=sid,
+            user=user,
+            host=host,
+            logon_type=rng.choice((2, 3, 5, 7, 10)),
+            ip=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            image=rng.choice(_IMAGES),
+            cmdline=rng.choice(_CMDLINES),
+            service=rng.choice(_SERVICES),
+            exe=rng.choice(_IMAGES).rsplit("\\", 1)[-1],
+            tmp=f"{rng.getrandbits(32):08x}",
+        )
+
+    def next(self) -> dict:
+        rng = self._rng
+        channel, provider, event_id, level, level_code, lines, _ = rng.choices(_TEMPLATES, self._weights)[0]
+        agent_id, host = rng.choice(self._agents)
+        user = rng.choice(_USERS)
+        sid = f"S-1-5-21-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}-{_USERS.index(user) + 1000}"
+
+        key = (agent_id, channel)
+        record_id = self._record_ids.get(key, 0) + 1
+        self._record_ids[key] = record_id
+        step = timedelta(milliseconds=rng.randint(1, 250))     # drawn either way: same traffic per seed
+        if self._clock is None:
+            timestamp = datetime.now(timezone.utc)
+        else:
+            self._clock += step
+            timestamp = self._clock
+
+        return {
+            "_id": f"{agent_id}:{channel}:{record_id}",
+            "agent_id": agent_id,
+            "record_id": record_id,
+            "timestamp": timestamp.isoformat(),
+            "channel": channel,
+            "event_id": event_id,
+            "provider": provider,
+            "event_host": host,
+            "user_sid": sid if channel == "Security" else None,
+            "level": level,
+            "level_code": level_code,
+            "message": [self._fill(line, host, user, sid) for line in lines],
+        }
+
+    def batch(self, size: int) -> List[dict]:
+        return [self.next() for _ in range(size)]
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            yield self.next()
@@ -0,0 +1,145 @@
+# bench/memory_mongo.py
+# --------------------------------------------------------------------------
+#  In-memory stand-in for the Motor `log_collection`.
+#  Implements only the calls LogDAO actually makes, and raises the same
+#  pymongo errors so the DAO's duplicate handling is exercised unchanged.
+# --------------------------------------------------------------------------
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _copy(doc: dict) -> dict:
+    # Mongo hands back a fresh document on every read; lists are the only
+    # mutable values in a log document.
+    return {k: list(v) if isinstance(v, list) else v for k, v in doc.items()}
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for k, v in query.items():
+        if isinstance(v, dict) and "$in" in v:
+            if doc.get(k) not in v["$in"]:
+                return False
+        elif doc.get(k) != v:
+            return False
+    return True
+
+
+class InMemoryCursor:
+    def __init__(self, docs: List[dict]):
+        self._docs = docs
+        self._sort: Optional[tuple] = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key: str, direction: int = ASCENDING) -> "InMemoryCursor":
+        self._sort = (key, direction)
+        return self
+
+    def skip(self, n: int) -> "InMemoryCursor":
+        self._skip = n
+        return self
+
+    def limit(self, n: int) -> "InMemoryCursor":
+        self._limit = n
+        return self
+
+    def _materialise(self) -> List[dict]:
+        docs = self._docs
+        if self._sort:
+            key, direction = self._sort
+            docs = sorted(docs, key=lambda d: d.get(key), reverse=direction != ASCENDING)
+        end = self._skip + self._limit if self._limit else None
+        return [_copy(d) for d in docs[self._skip:end]]
+
+    async def __aiter__(self):
+        for doc in self._materialise():
+            yield doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = self._materialise()
+        return docs if length is None else docs[:length]
+
+
+class InMemoryCollection:
+    """Dict-backed collection keyed by `_id`; insertion order is preserved."""
+
+    def __init__(self):
+        self._docs: Dict[Any, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def insert_one(self, doc: dict):
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error _id: {doc['_id']}")
+        self._docs[doc["_id"]] = _copy(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True):
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            if doc["_id"] in self._docs:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                if ordered:
+                    break
+                continue
+            self._docs[doc["_id"]] = _copy(doc)
+            inserted.append(doc["_id"])
+        if errors:
+            raise BulkWriteError({"nInserted": len(inserted), "writeErrors": errors})
+        return SimpleNamespace(inserted_ids=inserted)
+
+    async def find_one(self, query: dict) -> Optional[dict]:
+        if set(query) == {"_id"}:
+            doc = self._docs.get(query["_id"])
+            return _copy(doc) if doc else None
+        for doc in self._docs.values():
+            if _matches(doc, query):
+                return _copy(doc)
+        return None
+
+    def find(self, query: Optional[dict] = None) -> InMemoryCursor:
+        docs = list(self._docs.values())
+        if query:
+            docs = [d for d in docs if _matches(d, query)]
+        return InMemoryCursor(docs)
+
+    async def update_one(self, query: dict, update: dict):
+        doc = await self.find_one(query)
+        if doc is None:
+            return SimpleNamespace(matched_count=0, modified_count=0)
+        stored = self._docs[doc["_id"]]
+        changes = update.get("$set", {})
+        modified = any(stored.get(k) != v for k, v in changes.items())
+        stored.update(changes)
+        return SimpleNamespace(matched_count=1, modified_count=int(modified))
+
+    async def update_many(self, query: dict, update: dict):
+        changes = update.get("$set", {})
+        ids = query.get("_id", {}).get("$in") if isinstance(query.get("_id"), dict) else None
+        if ids is not None and set(query) == {"_id"}:
+            docs = [self._docs[i] for i in dict.fromkeys(ids) if i in self._docs]
+        else:
+            docs = [d for d in self._docs.values() if _matches(d, query)]
+        modified = 0
+        for stored in docs:
+            if any(stored.get(k) != v for k, v in changes.items()):
+                modified += 1
+            stored.update(changes)
+        return SimpleNamespace(matched_count=len(docs), modified_count=modified)
+
+    async def delete_one(self, query: dict):
+        doc = await self.find_one(query)
+        if doc is None:
+            return SimpleNamespace(deleted_count=0)
+        del self._docs[doc["_id"]]
+        return SimpleNamespace(deleted_count=1)
+
+    async def delete_many(self, query: dict):
+        doomed = [k for k, d in self._docs.items() if _matches(d, query)]
+        for key in doomed:
+            del self._docs[key]
+        return SimpleNamespace(deleted_count=len(doomed))
@@ -0,0 +1,382 @@
+# bench/runner.py
+# --------------------------------------------------------------------------
+#  Load / benchmark driver for the Scanalyzer API.
+#
+#  Runs the real FastAPI app in-process (httpx ASGI transport, no network)
+#  against the in-memory collection – or a local mongod with --mongo-uri –
+#  and reports throughput plus p50/p95/p99 latency per scenario.
+#  Results are compared with a baseline; a regression beyond the tolerance
+#  makes the process exit with status 1.
+#
+#  Absolute req/s only mean something on the machine that recorded them.
+#  bench/baselines/default.json is the reference box's baseline (its `_meta`
+#  block says which commit, Python and CPU count). On any other machine,
+#  record your own baseline from a clean checkout of the base branch first,
+#  then compare your change against it:
+#
+#    git stash / git checkout main
+#    python -m bench.runner --update-baseline --baseline bench/baselines/local.json
+#    git checkout my-branch
+#    python -m bench.runner --baseline bench/baselines/local.json
+#
+#  local*.json is git-ignored. Each scenario runs --repeat times (default 3)
+#  and the best run counts, which keeps scheduler noise out of the gate.
+#
+#  The baseline also records --scale, --concurrency, --repeat, --seed and the
+#  store (in-memory / mongo). Runs with different parameters are not compared
+#  (exit status 2) – record a separate baseline for them:
+#
+#    python -m bench.runner -s ingest -s get_logs --scale 0.5 \
+#        --baseline bench/baselines/local-half.json --update-baseline
+# --------------------------------------------------------------------------
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from starlette.websockets import WebSocket
+
+from bench.generator import EventGenerator
+from bench.memory_mongo import InMemoryCollection
+
+API_KEY = "123123123"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_BASELINE = BASELINE_DIR / "default.json"
+
+# Requests per scenario at --scale 1.0
+SCENARIO_SIZES: Dict[str, int] = {
+    "ingest":        2000,
+    "ingest_bulk":   40,     # × BULK_SIZE events
+    "get_logs":      200,
+    "classify":      500,
+    "stream_fanout": 500,
+}
+BULK_SIZE = 250
+FANOUT_CLIENTS = 25
+WARMUP = 10
+
+
+# ────────── Stats ─────────────────────────────────────────────────────────
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise(latencies: List[float], wall: float, events_per_request: int = 1) -> dict:
+    lat = sorted(latencies)
+    return {
+        "requests":   len(lat),
+        "throughput": round(len(lat) / wall, 1) if wall else 0.0,       # req/s
+        "events_per_s": round(len(lat) * events_per_request / wall, 1) if wall else 0.0,
+        "p50_ms":     round(percentile(lat, 50) * 1000, 3),
+        "p95_ms":     round(percentile(lat, 95) * 1000, 3),
+        "p99_ms":     round(percentile(lat, 99) * 1000, 3),
+    }
+
+
+async def drive(
+    n: int,
+    make_request: Callable[[int], Awaitable[httpx.Response]],
+    concurrency: int,
+    expect: int,
+) -> tuple[List[float], float]:
+    """Fire `n` requests with `concurrency` workers; returns (latencies, wall seconds)."""
+    latencies: List[float] = []
+    counter = iter(range(n))
+
+    async def worker():
+        for i in counter:
+            t0 = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != expect:
+                raise RuntimeError(
+                    f"unexpected status {response.status_code} (wanted {expect}): {response.text[:200]}"
+                )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+# ────────── Scenarios ─────────────────────────────────────────────────────
+
+async def bench_ingest(client, gen: EventGenerator, n: int, concurrency: int) -> dict:
+    payloads = gen.batch(n + WARMUP)
+    for body in payloads[:WARMUP]:
+        await client.post("/logs/ingest", json=body)
+    timed = payloads[WARMUP:]
+    latencies, wall = await drive(n, lambda i: client.post("/logs/ingest", json=timed[i]), concurrency, 202)
+    return summarise(latencies, wall)
+
+
+async def bench_ingest_bulk(client, gen: EventGenerator, n: int, concurrency: int) -> dict:
+    await client.post("/logs/ingest/bulk", json=gen.batch(BULK_SIZE))
+    batches = [gen.batch(BULK_SIZE) for _ in range(n)]
+    latencies, wall = await drive(n, lambda i: client.post("/logs/ingest/bulk", json=batches[i]), concurrency, 201)
+    return summarise(latencies, wall, events_per_request=BULK_SIZE)
+
+
+async def bench_get_logs(client, gen: EventGenerator, n: int, concurrency: int) -> dict:
+    # Seed enough documents that sort + skip + limit does real work.
+    for _ in range(20):
+        await client.post("/logs/ingest/bulk", json=gen.batch(BULK_SIZE))
+
+    queries = [
+        {"limit": 300},
+        {"limit": 100, "skip": 200},
+        {"channel": "Security", "limit": 300},
+        {"agent_id": "agent-001", "level": "Information", "limit": 50},
+    ]
+    for q in queries:
+        await client.get("/logs/", params=q)
+    latencies, wall = await drive(
+        n, lambda i: client.get("/logs/", params=queries[i % len(queries)]), concurrency, 200
+    )
+    return summarise(latencies, wall)
+
+
+async def bench_classify(client, gen: EventGenerator, n: int, concurrency: int) -> dict:
+    payloads = gen.batch(n + WARMUP)
+    for body in payloads[:WARMUP]:          # also forces the lazy model load
+        await client.post("/ml/classify", json=body)
+    timed = payloads[WARMUP:]
+    latencies, wall = await drive(n, lambda i: client.post("/ml/classify", json=timed[i]), concurrency, 201)
+    return summarise(latencies, wall)
+
+
+def _sink_socket(sink: List[dict]) -> WebSocket:
+    """A real starlette WebSocket whose ASGI `send` appends to `sink`."""
+    scope = {"type": "websocket", "path": "/streamer/logs/stream", "headers": [], "query_string": b""}
+
+    async def receive():
+        return {"type": "websocket.connect"}
+
+    async def send(message):
+        sink.append(message)
+
+    return WebSocket(scope, receive, send)
+
+
+async def bench_stream_fanout(client, gen: EventGenerator, n: int, concurrency: int) -> dict:
+    from app.services.streamer import streamer
+
+    sink: List[dict] = []
+    sockets = [_sink_socket(sink) for _ in range(FANOUT_CLIENTS)]
+    for ws in sockets:
+        await streamer.connect(ws)
+    try:
+        headers = {"x-api-key": API_KEY}
+        payloads = gen.batch(n + WARMUP)
+        for body in payloads[:WARMUP]:
+            await client.post("/streamer/ingest", json=body, headers=headers)
+        timed = payloads[WARMUP:]
+        sink.clear()
+        latencies, wall = await drive(
+            n, lambda i: client.post("/streamer/ingest", json=timed[i], headers=headers), concurrency, 200
+        )
+        delivered = sum(1 for m in sink if m["type"] == "websocket.send")
+        if delivered != n * FANOUT_CLIENTS:
+            raise RuntimeError(f"fan-out delivered {delivered} of {n * FANOUT_CLIENTS} messages")
+    finally:
+        for ws in sockets:
+            await streamer.disconnect(ws)
+    return summarise(latencies, wall, events_per_request=FANOUT_CLIENTS)
+
+
+SCENARIOS = {
+    "ingest":        bench_ingest,
+    "ingest_bulk":   bench_ingest_bulk,
+    "get_logs":      bench_get_logs,
+    "classify":      bench_classify,
+    "stream_fanout": bench_stream_fanout,
+}
+
+
+# ────────── Collection wiring ─────────────────────────────────────────────
+
+async def _install_collection(mongo_uri: Optional[str]):
+    """Point LogDAO at a fresh collection and start correlation from scratch; returns it."""
+    from app.dao import log_dao
+    from app.services.correlator import correlator
+
+    correlator.state_path = None          # never overwrite a real checkpoint from a bench run
+    correlator.reset()
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        collection = AsyncIOMotorClient(mongo_uri)["ScanalyzerBench"].get_collection("logs")
+        await collection.delete_many({})
+    else:
+        collection = InMemoryCollection()
+    log_dao.log_collection = collection
+    return collection
+
+
+# ────────── Baseline comparison ───────────────────────────────────────────
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    A scenario regresses when throughput drops, or p95 latency grows,
+    by more than `tolerance` (fraction) relative to the baseline.
+    """
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            failures.append(
+                f"{name}: throughput {current['throughput']} req/s < baseline {base['throughput']} req/s"
+            )
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {current['p95_ms']} ms > baseline {base['p95_ms']} ms")
+    return failures
+
+
+def print_table(results: Dict[str, dict], baseline: Dict[str, dict]):
+    header = f"{'scenario':<15}{'req':>7}{'req/s':>11}{'events/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Δ req/s':>10}"
+    print(header)
+    print("─" * len(header))
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{(r['throughput'] / base['throughput'] - 1) * 100:+.1f}%" if base else "n/a"
+        print(
+            f"{name:<15}{r['requests']:>7}{r['throughput']:>11}{r['events_per_s']:>12}"
+            f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{delta:>10}"
+        )
+
+
+# ────────── Entry point ───────────────────────────────────────────────────
+
+def run_params(args) -> dict:
+    """Everything besides the code and the machine that moves the numbers."""
+    return {
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "store": "mongo" if args.mongo_uri else "memory",
+    }
+
+
+def param_mismatches(recorded: Optional[dict], current: dict) -> List[str]:
+    if recorded is None:
+        return ["baseline does not record its run parameters"]
+    return [
+        f"{key}: baseline {recorded.get(key)!r}, this run {value!r}"
+        for key, value in current.items() if recorded.get(key) != value
+    ]
+
+
+def machine_meta(params: dict) -> dict:
+    """Where a baseline came from, so a mismatch can be spotted before trusting it."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": params,
+    }
+
+
+async def run(args) -> Dict[str, dict]:
+    from app.main import app
+
+    await _install_collection(args.mongo_uri)
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, dict] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in args.scenario or list(SCENARIOS):
+            n = max(1, int(SCENARIO_SIZES[name] * args.scale))
+            for _ in range(args.repeat):
+                gen = EventGenerator(seed=args.seed)
+                result = await SCENARIOS[name](client, gen, n, args.concurrency)
+                if name not in results or result["throughput"] > results[name]["throughput"]:
+                    results[name] = result
+                # Each run starts from an empty store so runs do not skew each other.
+                await _install_collection(args.mongo_uri)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scanalyzer API benchmark suite")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every scenario's request count")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best one counts")
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--mongo-uri", help="use a local mongod instead of the in-memory collection")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.30,
+                        help="allowed fractional regression before failing (default 0.30)")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to --baseline")
+    parser.add_argument("--json", type=Path, help="also write raw results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    meta = baseline.pop("_meta", None)
+    params = run_params(args)
+    mismatches = param_mismatches(meta.get("params") if meta else None, params) if baseline else []
+    if meta and not args.update_baseline:
+        print(f"Baseline {args.baseline}: commit {meta.get('commit')} on {meta.get('host')} "
+              f"({meta.get('cpu_count')} CPU, Python {meta.get('python')})")
+        if meta.get("host") != platform.node():
+            print("  recorded on another machine – absolute numbers are not comparable; "
+                  "see the header of bench/runner.py for the local-baseline workflow.")
+    if mismatches and not args.update_baseline:
+        print_table(results, {})
+        print(f"\nNot compared – run parameters differ from {args.baseline}:")
+        for line in mismatches:
+            print(f"  {line}")
+        return 2
+    print_table(results, baseline)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        # Scenarios recorded with other parameters are not kept alongside these.
+        kept = {} if mismatches else baseline
+        merged = {**kept, **results, "_meta": machine_meta(params)}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print("\nREGRESSION:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline." if baseline else "\nNo baseline found – nothing compared.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.correlation_rule import CorrelationRule
+from app.services.correlator import MAX_CLOCK_SKEW, CorrelationEngine, SlidingWindow
+
+
+def _rule(**overrides):
+    spec = {"name": "burst", "event_id": 4625, "window_seconds": 60, "threshold": 3, "slots": 6}
+    spec.update(overrides)
+    return CorrelationRule(**spec)
+
+
+def _log(log_id, age=0.0, host="WS-1", event_id=4625, **fields):
+    return {"_id": log_id, "event_id": event_id, "event_host": host,
+            "timestamp": time.time() - age, **fields}
+
+
+# ────────── SlidingWindow ─────────────────────────────────────────────────
+
+def test_ring_advance_expires_old_slots():
+    window = SlidingWindow(slots=4, keep=3)
+    assert window.add(10, "a") and window.add(11, "b") and window.add(13, "c")
+    assert window.total == 3
+    assert window.add(15, "d")                    # slots 10 and 11 fall out of (11, 15]
+    assert window.total == 2
+    assert window.add(100, "e")                   # jump further than a lap: ring cleared
+    assert window.total == 1 and sum(window.counts) == 1
+
+
+def test_out_of_window_and_duplicate_events_are_not_counted():
+    window = SlidingWindow(slots=4, keep=3)
+    window.add(10, "a")
+    assert not window.add(6, "old")               # slot <= head - slots
+    assert not window.add(10, "a")                # agent re-sent the same _id
+    assert window.total == 1
+
+
+def test_involved_returns_only_in_window_ids():
+    window = SlidingWindow(slots=4, keep=3)
+    window.add(1, "a")
+    window.add(2, "b")
+    window.add(5, "c")                            # slot 1 is now out of (1, 5]
+    assert window.involved() == ["b", "c"]
+
+
+# ────────── CorrelationEngine ─────────────────────────────────────────────
+
+def test_threshold_crossing_flags_whole_burst_once():
+    engine = CorrelationEngine([_rule()])
+    assert not engine.observe_batch([_log("a", 3), _log("b", 2)])
+    outcome = engine.observe_batch([_log("c", 1), _log("d")])
+
+    assert outcome.updates == {(("alert", True),): ["a", "b", "c", "d"]}
+    assert len(outcome.alerts) == 1 and outcome.alerts[0]["count"] == 3
+    # Still above the threshold: the new event is flagged, but no second alert.
+    follow_up = engine.observe_batch([_log("e")])
+    assert not follow_up.alerts
+    assert follow_up.updates == {(("alert", True),): ["e"]}
+
+
+def test_stale_and_far_future_events_are_ignored():
+    engine = CorrelationEngine([_rule()])
+    engine.observe_batch([_log("old", age=61)])
+    assert not engine.rules["burst"].windows
+
+    # A single far-future stamp must not move the ring ahead and blind the key.
+    engine.observe_batch([_log("future", age=-(MAX_CLOCK_SKEW + 60))])
+    assert not engine.rules["burst"].windows
+    outcome = engine.observe_batch([_log("a"), _log("b"), _log("c")])
+    assert len(outcome.alerts) == 1
+
+
+def test_skew_just_under_the_window_does_not_expire_counted_events():
+    engine = CorrelationEngine([_rule()])                  # 60 s window, 10 s slots
+    engine.observe_batch([_log("a"), _log("b")])
+    outcome = engine.observe_batch([_log("ahead", age=-59)])
+    window = engine.rules["burst"].windows["WS-1"]
+    assert window.total == 3 and len(outcome.alerts) == 1
+    # The head ran at most one slot ahead, so "now" still lands inside the window.
+    assert engine.observe_batch([_log("c")]).updates == {(("alert", True),): ["c"]}
+
+
+def test_provider_filter_and_keys_are_separate():
+    engine = CorrelationEngine([_rule(provider="Microsoft-Windows-Security-Auditing")])
+    logs = [_log(str(i), host=f"WS-{i % 2}", provider="microsoft-windows-security-auditing") for i in range(4)]
+    logs.append(_log("x", host="WS-0", provider="Other"))
+    assert not engine.observe_batch(logs)
+    assert {k: w.total for k, w in engine.rules["burst"].windows.items()} == {"WS-0": 2, "WS-1": 2}
+
+
+def test_evict_drops_idle_keys_and_trims_to_max_keys():
+    engine = CorrelationEngine([_rule()], max_keys=2)
+    engine.observe_batch([_log(str(i), host=f"WS-{i}") for i in range(4)])
+    assert engine.evict() == 2
+    assert list(engine.rules["burst"].windows) == ["WS-2", "WS-3"]
+    assert engine.evict(now=time.time() + 61) == 2
+
+
+def test_checkpoint_restore_round_trip(tmp_path):
+    path = tmp_path / "state.json"
+    engine = CorrelationEngine([_rule()], state_path=path)
+    engine.observe_batch([_log("a", 2), _log("b", 1)])
+    assert asyncio.run(engine.checkpoint_async())
+
+    restored = CorrelationEngine([_rule()], state_path=path)
+    window = restored.rules["burst"].windows["WS-1"]
+    assert (window.total, list(window.counts)) == (2, list(engine.rules["burst"].windows["WS-1"].counts))
+    # The restored window carries on counting towards the same threshold.
+    assert len(restored.observe_batch([_log("c")]).alerts) == 1
+
+
+def test_restore_discards_windows_of_changed_rules(tmp_path):
+    path = tmp_path / "state.json"
+    engine = CorrelationEngine([_rule(), _rule(name="other")], state_path=path)
+    engine.observe_batch([_log("a")])
+    assert engine.checkpoint()
+
+    restored = CorrelationEngine([_rule(threshold=5), _rule(name="other")], state_path=path)
+    assert not restored.rules["burst"].windows
+    assert list(restored.rules["other"].windows) == ["WS-1"]
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"version": 1}), '{"version": 2, "rules": {}}\n[1]\n'])
+def test_unreadable_checkpoint_starts_empty(tmp_path, content):
+    path = tmp_path / "state.json"
+    path.write_text(content)
+    engine = CorrelationEngine([_rule()], state_path=path)
+    assert engine.restore() == 0
+    assert not engine.rules["burst"].windows
+
+
+@pytest.mark.parametrize("field", ["event_id", "provider"])
+def test_empty_rule_lists_are_rejected(field):
+    with pytest.raises(ValidationError):
+        _rule(**{field: []})
+
+
+# ────────── Ingest route ──────────────────────────────────────────────────
+
+def test_failed_store_is_not_counted_and_the_retry_fires(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api import log_routes
+    from app.dao import log_dao
+    from bench.memory_mongo import InMemoryCollection
+
+    collection = InMemoryCollection()
+    real_insert_many = collection.insert_many
+    failures = [RuntimeError("mongo went away")]
+
+    async def insert_many(docs, ordered=True):
+        if failures:
+            raise failures.pop()
+        return await real_insert_many(docs, ordered=ordered)
+
+    alerts = []
+
+    async def broadcast(message):
+        alerts.append(message)
+
+    monkeypatch.setattr(collection, "insert_many", insert_many)
+    monkeypatch.setattr(log_dao, "log_collection", collection)
+    monkeypatch.setattr(log_routes, "correlator", CorrelationEngine([_rule()]))
+    monkeypatch.setattr(log_routes.streamer, "broadcast", broadcast)
+
+    app = FastAPI()
+    app.include_router(log_routes.router)
+    payload = [{
+        "_id": f"agent-1:Security:{i}", "agent_id": "agent-1", "record_id": i,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(time.time() - i)),
+        "channel": "Security", "event_id": 4625, "provider": "Microsoft-Windows-Security-Auditing",
+        "event_host": "WS-1", "level": "Information", "level_code": 4, "message": ["An account failed to log on."],
+    } for i in range(3)]
+
+    with TestClient(app) as client:
+        assert client.post("/logs/ingest/bulk", json=payload).status_code == 500
+        assert not alerts
+        assert client.post("/logs/ingest/bulk", json=payload).status_code == 201
+
+    assert len(alerts) == 1
+    stored = asyncio.run(collection.find({}).to_list())
+    assert len(stored) == 3 and all(doc["alert"] for doc in stored)
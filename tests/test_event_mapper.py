@@ -0,0 +1,60 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.utils.event_mapper import EventCatalog
+
+
+def _write(path, payload, bump=0):
+    path.write_text(payload if isinstance(payload, str) else json.dumps(payload))
+    stamp = time.time() + bump
+    os.utime(path, (stamp, stamp))
+
+
+def test_lookup_by_provider_alias_and_unambiguous_id():
+    catalog = EventCatalog()
+    assert catalog.lookup(4624, "Microsoft-Windows-Security-Auditing") == "An account was successfully logged on."
+    assert catalog.lookup(1, "sysmon") == "Process creation."
+    assert catalog.lookup(4625) == "An account failed to log on."
+    # Event 1 means different things to different providers – no ID-only fallback.
+    assert catalog.lookup(1) is None
+
+
+def test_unknown_provider_does_not_borrow_another_providers_description():
+    catalog = EventCatalog()
+    assert catalog.lookup(4625, "MyCustomApp") is None
+    assert catalog.lookup(4625, "") == "An account failed to log on."
+
+
+@pytest.mark.parametrize("bad", [
+    {"providers": {"Custom": {"not-an-id": "x"}}},   # ValueError
+    {"providers": {"Custom": {"1": 5}}},             # TypeError
+    [1, 2, 3],                                        # AttributeError
+    "{not json",
+])
+def test_broken_overrides_at_startup_fall_back_to_packaged_catalog(tmp_path, bad):
+    overrides = tmp_path / "overrides.json"
+    _write(overrides, bad)
+    catalog = EventCatalog(overrides_path=overrides, reload_interval=0)
+    assert catalog.lookup(4624, "Security") == "An account was successfully logged on."
+
+
+def test_broken_overrides_on_reload_keep_previous_tables_and_are_not_retried(tmp_path, monkeypatch):
+    overrides = tmp_path / "overrides.json"
+    _write(overrides, {"providers": {"Custom": {"1": "one"}}})
+    catalog = EventCatalog(overrides_path=overrides, reload_interval=0)
+    assert catalog.lookup(1, "Custom") == "one"
+
+    _write(overrides, [1], bump=5)
+    assert catalog.lookup(1, "Custom") == "one"
+
+    calls = []
+    monkeypatch.setattr(catalog, "reload", lambda: calls.append(1))
+    catalog.lookup(1, "Custom")
+    assert calls == []                                # same mtime → no second attempt
+
+    monkeypatch.undo()
+    _write(overrides, {"providers": {"Custom": {"1": "two"}}}, bump=10)
+    assert catalog.lookup(1, "Custom") == "two"
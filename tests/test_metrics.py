@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.metrics import HTTP_REQUEST_SECONDS, Counter, Histogram, MetricsMiddleware
+
+
+def _samples(lines):
+    return [line for line in lines if not line.startswith("#")]
+
+
+def test_histogram_buckets_are_cumulative_and_le_inclusive():
+    hist = Histogram("h_seconds", "doc", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):           # 0.1 sits exactly on a bucket boundary
+        hist.observe(value, route="/x")
+
+    assert _samples(hist.render()) == [
+        'h_seconds_bucket{route="/x",le="0.1"} 2',
+        'h_seconds_bucket{route="/x",le="1.0"} 3',
+        'h_seconds_bucket{route="/x",le="+Inf"} 4',
+        'h_seconds_sum{route="/x"} 2.65',
+        'h_seconds_count{route="/x"} 4',
+    ]
+    assert hist.count(route="/x") == 4
+
+
+def test_counter_family_gets_total_suffix():
+    count = Counter("c_events", "Events seen.", ("rule",))
+    count.inc(rule="a")
+    count.inc(2, rule="a")
+    assert count.render() == [
+        "# HELP c_events_total Events seen.",
+        "# TYPE c_events_total counter",
+        'c_events_total{rule="a"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    count = Counter("c_escaped", "doc", ("rule",))
+    count.inc(rule='back\\slash "quoted"\nnext')
+    assert _samples(count.render()) == ['c_escaped_total{rule="back\\\\slash \\"quoted\\"\\nnext"} 1']
+
+
+def test_middleware_labels_requests_with_the_route_template():
+    app = FastAPI()
+
+    @app.get("/logs/{log_id}")
+    async def get_log(log_id: str):
+        return {"id": log_id}
+
+    app.add_middleware(MetricsMiddleware)
+    labels = {"method": "GET", "route": "/logs/{log_id}", "status": "200"}
+    before = HTTP_REQUEST_SECONDS.count(**labels)
+
+    with TestClient(app) as client:
+        for log_id in ("a", "b", "c"):
+            assert client.get(f"/logs/{log_id}").status_code == 200
+        assert client.get("/nowhere").status_code == 404
+
+    assert HTTP_REQUEST_SECONDS.count(**labels) == before + 3
+    assert not any("/logs/a" in key for key in HTTP_REQUEST_SECONDS._series)
+    assert HTTP_REQUEST_SECONDS.count(method="GET", route="unmatched", status="404") >= 1
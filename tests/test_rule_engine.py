@@ -0,0 +1,112 @@
+import json
+import os
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.alert_rule import AlertRule
+from app.services.rule_engine import DEFAULT_RULES_PATH, CompiledRuleSet, load_rules
+
+
+def _rules(*specs):
+    return CompiledRuleSet([AlertRule(**spec) for spec in specs])
+
+
+def _log(event_id=4688, message=(), **fields):
+    return {"event_id": event_id, "message": list(message), **fields}
+
+
+def test_packaged_rules_compile():
+    assert load_rules(DEFAULT_RULES_PATH).rules
+
+
+@pytest.mark.parametrize("field", ["event_id", "provider", "channel", "level", "message_contains", "message_regex"])
+def test_empty_condition_lists_are_rejected(field):
+    with pytest.raises(ValidationError):
+        AlertRule(name="empty", **{field: []})
+
+
+def test_event_id_dispatch_and_wildcard_rules_share_buckets():
+    rules = _rules(
+        {"name": "by-id", "event_id": 4625, "alert": True},
+        {"name": "any-critical", "level": "Critical", "trigger": True},
+    )
+    assert rules.evaluate(_log(4625, level="Information")) == (True, False, ["by-id"])
+    assert rules.evaluate(_log(4625, level="critical")) == (True, True, ["by-id", "any-critical"])
+    # Unlisted IDs go to the fallback bucket, which only holds the wildcard rule.
+    assert rules.evaluate(_log(9999, level="CRITICAL")) == (False, True, ["any-critical"])
+    assert rules.evaluate(_log(9999, level="Information")) == (False, False, [])
+
+
+def test_field_conditions_are_case_insensitive_and_anded():
+    rules = _rules({"name": "r", "event_id": 4732, "provider": "Microsoft-Windows-Security-Auditing",
+                    "message_contains": "Administrators", "alert": True})
+    assert rules.evaluate(_log(4732, ["Group: ADMINISTRATORS"], provider="microsoft-windows-security-auditing"))[0]
+    assert not rules.evaluate(_log(4732, ["Group: Administrators"], provider="Other"))[0]
+    assert not rules.evaluate(_log(4732, ["Group: Users"], provider="Microsoft-Windows-Security-Auditing"))[0]
+
+
+def test_prefilter_hit_for_one_rule_does_not_leak_to_another():
+    rules = _rules(
+        {"name": "mimikatz", "message_contains": "mimikatz", "alert": True},
+        {"name": "certutil", "message_contains": "certutil -urlcache", "trigger": True},
+    )
+    assert rules.evaluate(_log(message=["running MIMIKATZ"])) == (True, False, ["mimikatz"])
+
+
+def test_case_sensitive_substring_and_scoped_regex_flags():
+    rules = _rules(
+        {"name": "exact", "message_contains": "Foo", "ignore_case": False, "alert": True},
+        {"name": "enc", "message_regex": r"-enc\s+\S{8,}", "trigger": True},
+    )
+    assert rules.evaluate(_log(message=["foo"])) == (False, False, [])
+    assert rules.evaluate(_log(message=["Foo"])) == (True, False, ["exact"])
+    assert rules.evaluate(_log(message=["powershell -ENC SQBFAFgAIAAo"])) == (False, True, ["enc"])
+
+
+def test_capture_group_rule_bypasses_the_combined_prefilter():
+    rules = _rules(
+        {"name": "plain", "message_regex": "zzz", "alert": True},
+        {"name": "backref", "message_regex": r"(ab)\1", "trigger": True},
+    )
+    bucket = rules.fallback
+    assert "\\1" not in bucket.exact_prefilter.pattern          # renumbering would break it
+    # The prefilter ("zzz") misses, yet the backreference rule is still evaluated.
+    assert rules.evaluate(_log(message=["xABAB"])) == (False, True, ["backref"])
+    assert rules.evaluate(_log(message=["xabba"])) == (False, False, [])
+
+
+def test_message_lines_are_joined_not_concatenated():
+    rules = _rules({"name": "r", "message_contains": "ab", "alert": True})
+    assert rules.evaluate(_log(message=["a", "b"])) == (False, False, [])
+
+
+def _write(path, payload, bump=0):
+    path.write_text(json.dumps(payload))
+    stamp = time.time() + bump
+    os.utime(path, (stamp, stamp))
+
+
+def test_reload_rejects_broken_file_and_keeps_rules(tmp_path, monkeypatch):
+    from app.services import rule_engine
+    from app.services.rule_engine import RuleEngine
+
+    path = tmp_path / "rules.json"
+    _write(path, {"rules": [{"name": "a", "event_id": 1, "alert": True}]})
+    engine = RuleEngine(path, reload_interval=0)
+    _write(path, {"rules": [{"name": "a", "event_id": [], "alert": True}]}, bump=5)
+    assert engine.reload() is False
+    assert engine.apply({"event_id": 1}) == {"event_id": 1, "alert": True}
+
+    # The broken file is not re-read on every poll, only once it changes again.
+    calls = []
+    real_load = rule_engine.load_rules
+    monkeypatch.setattr(rule_engine, "load_rules", lambda p: calls.append(p) or real_load(p))
+    for _ in range(3):
+        engine.apply({"event_id": 1})
+    assert calls == []
+
+    _write(path, {"rules": [{"name": "a", "event_id": 1, "trigger": True}]}, bump=10)
+    assert engine.apply({"event_id": 1}) == {"event_id": 1, "trigger": True}
+    assert len(calls) == 1